@@ -1,4 +1,167 @@
 from numpy import *
+from scipy import sparse
+from scipy.optimize import linprog
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger('AHP')
+
+class Metrics:
+    """
+    Instrumentation of Analytic Hierarchy Process calculation.
+    Records are collected only while enabled is True.
+
+    Attributes
+    __________
+
+    enabled : bool
+        If enabled is False, nothing is recorded.
+
+    mpcstat : dictionary
+        Statistics of matrices keyed by (kind, n).
+        kind is class name of the matrix (Mpc, Fmpc or Impc) or the name
+        given by the caller, and n is size of the matrix.
+        Each value has solves, seconds, maxsec, iters and hits.
+
+    synstat : dictionary
+        Statistics of Hierarchy.run keyed by number of hierarchy.
+        Each value has runs, seconds and maxsec.
+
+    lock : threading.Lock
+        Lock for updating statistics from many threads.
+    """
+
+    mpcname = (('solves', 'counter'), ('seconds', 'counter'),\
+        ('maxsec', 'gauge'), ('iters', 'counter'), ('hits', 'counter'))
+    synname = (('runs', 'counter'), ('seconds', 'counter'), ('maxsec', 'gauge'))
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clear all records.
+        """
+        with self.lock:
+            self.mpcstat = {}
+            self.synstat = {}
+
+    def solve(self, mat, sec, iters = 0, hit = False, name = None):
+        """
+        Record one solve of matrix for pairwise comparsion.
+
+        Parameters
+        __________
+
+        mat : Mpc, Fmpc or Impc
+            Solved matrix.
+
+        sec : float
+            Latency of solve in seconds.
+
+        iters : int
+            Iteration count of the solver. 0 for direct solvers.
+
+        hit : bool
+            If the result was taken from cache, hit is True.
+
+        name : str
+            Kind of the record. If name is None, class name of mat is used.
+        """
+        key = (type(mat).__name__ if name is None else name, int(mat.n))
+        with self.lock:
+            st = self.mpcstat.setdefault(key, {'solves': 0, 'seconds': 0.0,\
+                'maxsec': 0.0, 'iters': 0, 'hits': 0})
+            st['solves'] += 1
+            st['seconds'] += sec
+            st['maxsec'] = sec if sec > st['maxsec'] else st['maxsec']
+            st['iters'] += iters
+            st['hits'] += int(hit)
+
+    def synth(self, layer, sec):
+        """
+        Record synthesis time of one hierarchy in Hierarchy.run.
+
+        Parameters
+        __________
+
+        layer : int
+            Number of hierarchy.
+
+        sec : float
+            Synthesis time in seconds.
+        """
+        with self.lock:
+            st = self.synstat.setdefault(int(layer), {'runs': 0,\
+                'seconds': 0.0, 'maxsec': 0.0})
+            st['runs'] += 1
+            st['seconds'] += sec
+            st['maxsec'] = sec if sec > st['maxsec'] else st['maxsec']
+
+    def records(self):
+        """
+        Make structured records of all statistics.
+
+        Returns
+        __________
+
+        recs : list of dictionary
+            Records with key "kind" of "mpc" or "layer".
+        """
+        recs = []
+        with self.lock:
+            for (mpc, n), st in sorted(self.mpcstat.items()):
+                recs.append(dict(kind = 'mpc', mpc = mpc, n = n, **st))
+            for key, st in sorted(self.synstat.items()):
+                recs.append(dict(kind = 'layer', layer = key, **st))
+        return recs
+
+    def dump(self, stream = None):
+        """
+        Export statistics as JSON lines.
+
+        Parameters
+        __________
+
+        stream : file object
+            Destination of JSON lines.
+            If stream is None, each line is sent to logger "AHP".
+        """
+        for rec in self.records():
+            if stream is None:
+                logger.info(json.dumps(rec))
+            else:
+                stream.write(json.dumps(rec) + '\n')
+
+    def prometheus(self):
+        """
+        Export statistics in Prometheus text format.
+
+        Returns
+        __________
+
+        text : str
+            Text for scraping by Prometheus.
+        """
+        recs = self.records()
+        lines = []
+        for kind, lblname, names in (('mpc', ('mpc', 'n'), self.mpcname),\
+            ('layer', ('layer',), self.synname)):
+            for name, typ in names:
+                metric = 'ahp_{}_{}'.format(kind, name)
+                lines.append('# TYPE {} {}'.format(metric, typ))
+                for rec in recs:
+                    if rec['kind'] != kind:
+                        continue
+                    lbl = ','.join('{}="{}"'.format(k, rec[k]) for k in lblname)
+                    lines.append('{}{{{}}} {}'.format(metric, lbl, rec[name]))
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
 
 class Mpc:
     """
@@ -43,19 +206,34 @@ class Mpc:
         """
         self.n = numitem
         self.mA = identity(self.n)
+        self.eigkey = None
         self.caleig()
         self.ci = (self.evalmax - self.n) / (self.n - 1)
 
     def caleig(self):
         """
         Calculate maximum eigenvalue and eigenvector for maximum eigenvalue.
+        If mA is unchanged from the last calculation, the result is reused.
         """
+        t = time.perf_counter() if metrics.enabled else None
+        key = self.mA.tobytes()
+        if key == self.eigkey:
+            if t is not None:
+                metrics.solve(self, time.perf_counter() - t, hit = True)
+            return
+        self.eigkey = key
         self.evallist,self.eveclist = linalg.eig(self.mA)
         self.evalmax = 0
+        self.eveclist = self.eveclist.T
         for i in arange(self.n):
+
+            self.eveclist[i] /= linalg.norm(self.eveclist[i])
+            self.eveclist[i] /= self.eveclist[i].sum()
             if self.evalmax < self.evallist[i]:
                 self.evalmax = self.evallist[i]
                 self.evecmax = self.eveclist[i]
+        if t is not None:
+            metrics.solve(self, time.perf_counter() - t)
 
     def setval(self,i,j,x):
         """
@@ -73,9 +251,17 @@ class Mpc:
         x : float64
             Value of i-th row and j-th column of matrix mA.
         """
+        if not self.mA.flags.writeable:
+            self.mA = self.mA.copy()
         self.mA[i][j] = x
         self.mA[j][i] = 1 / x
-        self.mA.caleig()
+        self.caleig()
+
+    def pristates(self):
+        """
+        Show matrix mA and CI to logger "AHP".
+        """
+        logger.debug('%s\nci = %s', self.mA, self.ci)
 
     def cons(self):
         """
@@ -88,14 +274,646 @@ class Mpc:
             If matrix mA is consistent, judge is True.
         """
         self.ci = (self.evalmax - self.n) / (self.n - 1)
-        print(self.mA)
-        print('ci = {}'.format(self.ci))
         if self.ci < 0.1:
             judge = True
         else:
             judge = False
         return judge
 
+def fuzgeomean(fmat):
+    """
+    Calculate fuzzy weights by the fuzzy geometric mean method.
+
+    Parameters
+    __________
+
+    fmat : ndarray(..., n, n, 3)
+        Fuzzy matrices for pairwise comparsion.
+        The last axis holds triangular fuzzy numbers as (lower, middle, upper).
+        Any number of leading axes are calculated at once.
+
+    Returns
+    __________
+
+    fweight : ndarray(..., n, 3)
+        Fuzzy weights as triangular fuzzy numbers.
+    """
+    fmat = asarray(fmat, dtype = float)
+    geo = exp(log(fmat).mean(axis = -2))
+    tot = geo.sum(axis = -2, keepdims = True)
+    return geo / tot[..., ::-1]
+
+def defuzzify(fnum):
+    """
+    Defuzzify triangular fuzzy numbers by the centroid method.
+
+    Parameters
+    __________
+
+    fnum : ndarray(..., 3)
+        Triangular fuzzy numbers as (lower, middle, upper).
+
+    Returns
+    __________
+
+    crisp : ndarray(...)
+        Crisp values of fnum.
+    """
+    return asarray(fnum, dtype = float).mean(axis = -1)
+
+class Fmpc:
+    """
+    Fuzzy matrix for pairwise comparsion (for Fuzzy Analytic Hierarchy Process).
+    Instances of this class can be used in Hierarchy instead of Mpc.
+
+    Attributes
+    __________
+
+    mA : ndarray(n,n,3)
+        Fuzzy matrix for pairwise comparsion.
+        Each judgment is triangular fuzzy number (lower, middle, upper).
+
+    n : int
+        Number of elements of matrix mA.
+
+    fweight : ndarray(n,3)
+        Fuzzy weights calculated by fuzzy geometric mean method.
+
+    stale : bool
+        If mA was changed after fweight was calculated, stale is True.
+        Stale matrices are calculated together by Hierarchy.calfuz.
+
+    evecmax : ndarray(n)
+        Normalized defuzzified fuzzy weights.
+        Same role as Mpc.evecmax so that Hierarchy.run can mix Mpc and Fmpc.
+
+    evalmax : float64
+        Maximum eigenvalue of middle values of mA.
+
+    ci : float64
+        CI(Consistency Index) of middle values of mA.
+    """
+
+    def __init__(self, numitem):
+        """
+        Parameters
+        __________
+
+        numitem : int
+            Number of items in the same hierarchy.
+        """
+        self.n = numitem
+        self.mA = ones((self.n, self.n, 3))
+        self.fweight = full((self.n, 3), 1 / self.n)
+        self.evecmax = full(self.n, 1 / self.n)
+        self.evalmax = float(self.n)
+        self.stale = False
+        self.ci = (self.evalmax - self.n) / (self.n - 1)
+
+    def calfuz(self):
+        """
+        Calculate fuzzy weights, defuzzified weights and maximum eigenvalue.
+        """
+        t = time.perf_counter() if metrics.enabled else None
+        self.setfuz(fuzgeomean(self.mA))
+        if t is not None:
+            metrics.solve(self, time.perf_counter() - t)
+
+    def setfuz(self, fweight, evalmax = None):
+        """
+        Set fuzzy weights calculated outside (e.g. by Hierarchy.calfuz).
+
+        Parameters
+        __________
+
+        fweight : ndarray(n,3)
+            Fuzzy weights of matrix mA.
+
+        evalmax : float64
+            Maximum eigenvalue of middle values of mA.
+            If evalmax is None, it is calculated here.
+        """
+        self.fweight = fweight
+        crisp = defuzzify(fweight)
+        self.evecmax = crisp / crisp.sum()
+        if evalmax is None:
+            evalmax = linalg.eigvals(self.mA[:, :, 1]).real.max()
+        self.evalmax = evalmax
+        self.stale = False
+
+    def setval(self,i,j,x):
+        """
+        Change the value of i-th row and j-th column of matrix mA to x.
+
+        Parameters
+        __________
+
+        i : int
+            Index of row of matrix mA.
+
+        j : int
+            Index of column of matrix mA.
+
+        x : float64 or sequence of 3 float64
+            Triangular fuzzy number (lower, middle, upper).
+            If x is float64, x is treated as (x, x, x).
+
+        Notes
+        __________
+        Weights are not recalculated here. They are calculated by
+        Hierarchy.calfuz (called from run and runfuz) or by cons.
+        """
+        x = broadcast_to(asarray(x, dtype = float), (3,))
+        if not self.mA.flags.writeable:
+            self.mA = self.mA.copy()
+        self.mA[i][j] = x
+        self.mA[j][i] = 1 / x[::-1]
+        self.stale = True
+
+    def pristates(self):
+        """
+        Show matrix mA and CI to logger "AHP".
+        """
+        logger.debug('%s\nci = %s', self.mA, self.ci)
+
+    def cons(self):
+        """
+        Calculate Consistency Index of middle values of matrix mA.
+
+        Returns
+        __________
+
+        judge : bool
+            If matrix mA is consistent, judge is True.
+        """
+        if self.stale:
+            self.calfuz()
+        self.ci = (self.evalmax - self.n) / (self.n - 1)
+        if self.ci < 0.1:
+            judge = True
+        else:
+            judge = False
+        return judge
+
+def intbounds(lismat, names = None):
+    """
+    Calculate lower and upper bounds of priorities for interval judgments.
+    Bounds of all elements of all matrices are calculated by a single
+    linear programming.
+
+    Parameters
+    __________
+
+    lismat : list of ndarray(n, n, 2)
+        Interval matrices for pairwise comparsion.
+        The last axis holds (lower, upper) of each judgment.
+        Size n may be different for each matrix.
+
+    names : list of str
+        Names of matrices used in error message.
+        If names is None, positions in lismat are used.
+
+    Returns
+    __________
+
+    lisbound : list of ndarray(n, 2)
+        (lower, upper) of priority of each element.
+
+    nit : int
+        Iteration count of the solver.
+
+    Notes
+    __________
+    Priorities w satisfy lower_ij * w_j <= w_i <= upper_ij * w_j,
+    sum(w) = 1 and w >= 0. For each element, the minimum and the maximum
+    of w_i over this region are the bounds. These 2n problems of each
+    matrix are independent, so they are put together as one block
+    diagonal problem.
+    If the problem is infeasible, each matrix is solved alone to find
+    the inconsistent ones, and ValueError names them.
+    """
+    lisA = []
+    lisE = []
+    lisc = []
+    for mat in lismat:
+        n = mat.shape[0]
+        i, j = nonzero(~identity(n, dtype = bool))
+        row = arange(len(i))
+        blk = sparse.coo_matrix((concatenate((mat[i, j, 0], -ones(len(i)))),\
+            (concatenate((row, row)), concatenate((j, i)))), shape = (len(i), n))
+        lisA.append(sparse.kron(sparse.identity(2 * n), blk))
+        lisE.append(sparse.kron(sparse.identity(2 * n), ones((1, n))))
+        lisc.append(concatenate((identity(n).ravel(), -identity(n).ravel())))
+    c = concatenate(lisc)
+    A = sparse.block_diag(lisA, format = 'csr')
+    E = sparse.block_diag(lisE, format = 'csr')
+    res = linprog(c, A_ub = A, b_ub = zeros(A.shape[0]), A_eq = E,\
+        b_eq = ones(E.shape[0]), bounds = (0, None), method = 'highs')
+    if res.status == 2 and len(lismat) > 1:
+        names = names if names is not None else [str(k) for k in range(len(lismat))]
+        bad = []
+        for mat, name in zip(lismat, names):
+            try:
+                intbounds([mat])
+            except ValueError:
+                bad.append(name)
+        raise ValueError('Interval judgments are inconsistent: {}'\
+            .format(', '.join(bad)))
+    if res.status != 0:
+        name = '' if names is None else ', '.join(names) + ': '
+        raise ValueError('Interval judgments are inconsistent: ' + name\
+            + res.message)
+    lisbound = []
+    pos = 0
+    for mat in lismat:
+        n = mat.shape[0]
+        x = res.x[pos:pos + 2 * n * n].reshape(2, n, n)
+        lisbound.append(stack((x[0].diagonal(), x[1].diagonal()), axis = 1))
+        pos += 2 * n * n
+    return lisbound, int(res.nit)
+
+class Impc:
+    """
+    Interval matrix for pairwise comparsion (for Interval Analytic Hierarchy Process).
+    Instances of this class can be used in Hierarchy instead of Mpc.
+
+    Attributes
+    __________
+
+    mA : ndarray(n,n,2)
+        Interval matrix for pairwise comparsion.
+        Each judgment is (lower, upper).
+
+    n : int
+        Number of elements of matrix mA.
+
+    bound : ndarray(n,2)
+        (lower, upper) of priority of each element.
+
+    evecmax : ndarray(n)
+        Normalized midpoints of bound.
+        Same role as Mpc.evecmax so that Hierarchy.run can mix Mpc and Impc.
+
+    evalmax : float64
+        Maximum eigenvalue of geometric midpoints of mA.
+
+    ci : float64
+        CI(Consistency Index) of geometric midpoints of mA.
+
+    stale : bool
+        If mA was changed after bound was calculated, stale is True.
+        Stale matrices are calculated together by Hierarchy.calint.
+    """
+
+    def __init__(self, numitem):
+        """
+        Parameters
+        __________
+
+        numitem : int
+            Number of items in the same hierarchy.
+        """
+        self.n = numitem
+        self.mA = ones((self.n, self.n, 2))
+        self.bound = full((self.n, 2), 1 / self.n)
+        self.stale = False
+        self.evecmax = full(self.n, 1 / self.n)
+        self.evalmax = float(self.n)
+        self.ci = (self.evalmax - self.n) / (self.n - 1)
+
+    def calint(self):
+        """
+        Calculate bounds of priorities and maximum eigenvalue.
+        """
+        t = time.perf_counter() if metrics.enabled else None
+        lisbound, nit = intbounds([self.mA])
+        self.setint(lisbound[0])
+        if t is not None:
+            metrics.solve(self, time.perf_counter() - t, iters = nit)
+
+    def setint(self, bound):
+        """
+        Set bounds of priorities calculated outside (e.g. by Hierarchy.calint).
+
+        Parameters
+        __________
+
+        bound : ndarray(n,2)
+            (lower, upper) of priority of each element.
+        """
+        self.bound = bound
+        self.stale = False
+        mid = bound.mean(axis = 1)
+        self.evecmax = mid / mid.sum()
+        self.evalmax = linalg.eigvals(sqrt(self.mA.prod(axis = 2))).real.max()
+
+    def setval(self,i,j,x):
+        """
+        Change the value of i-th row and j-th column of matrix mA to x.
+        The bounds are not recalculated here. They are calculated by
+        Hierarchy.calint (called from run and runint) or by cons.
+
+        Parameters
+        __________
+
+        i : int
+            Index of row of matrix mA.
+
+        j : int
+            Index of column of matrix mA.
+
+        x : float64 or sequence of 2 float64
+            Interval judgment (lower, upper), e.g. (3, 4) for hesitation
+            between '重要' and 'かなり重要'.
+            If x is float64, x is treated as (x, x).
+        """
+        x = broadcast_to(asarray(x, dtype = float), (2,))
+        if not self.mA.flags.writeable:
+            self.mA = self.mA.copy()
+        self.mA[i][j] = x
+        self.mA[j][i] = 1 / x[::-1]
+        self.stale = True
+
+    def pristates(self):
+        """
+        Show matrix mA and CI to logger "AHP".
+        """
+        logger.debug('%s\nci = %s', self.mA, self.ci)
+
+    def cons(self):
+        """
+        Calculate Consistency Index of geometric midpoints of matrix mA.
+        If mA is stale, bounds are calculated first.
+
+        Returns
+        __________
+
+        judge : bool
+            If matrix mA is consistent, judge is True.
+            If interval judgments have no feasible priorities, judge is False.
+        """
+        if self.stale:
+            try:
+                self.calint()
+            except ValueError:
+                self.ci = inf
+                return False
+        self.ci = (self.evalmax - self.n) / (self.n - 1)
+        if self.ci < 0.1:
+            judge = True
+        else:
+            judge = False
+        return judge
+
+class History:
+    """
+    Versioned judgment history of Hierarchy with undo, redo and scenarios.
+    Snapshots share states of unchanged matrices, and matrices with the same
+    values share one state including calculated eigenvalues and weights.
+
+    Attributes
+    __________
+
+    trghie : Hierarchy
+        Target AHP system.
+
+    versions : list of tuple
+        States of all matrices of each version.
+        Each version is a tuple for each hierarchy of tuples of states.
+
+    branches : dictionary
+        Lists of version numbers keyed by scenario name.
+
+    branch : str
+        Name of current scenario.
+
+    pos : dictionary
+        Position of current version in each scenario.
+
+    cache : dictionary
+        States of matrices keyed by type and values of matrix.
+
+    Notes
+    __________
+    mA of matrices is made read-only when a snapshot is taken.
+    setval of Mpc, Fmpc and Impc copies mA before writing (copy-on-write).
+    """
+
+    def __init__(self, trghie):
+        """
+        Parameters
+        __________
+
+        trghie : Hierarchy
+            Target AHP system. makemat must have been called.
+        """
+        self.trghie = trghie
+        self.versions = []
+        self.branches = {'main': []}
+        self.branch = 'main'
+        self.pos = {'main': -1}
+        self.cache = {}
+        self.commit()
+
+    def freeze(self, mat, prev):
+        """
+        Make shared state of matrix.
+
+        Parameters
+        __________
+
+        mat : Mpc, Fmpc or Impc
+            Target matrix.
+
+        prev : dictionary
+            State of the matrix in current version.
+
+        Returns
+        __________
+
+        state : dictionary
+            Attributes of the matrix.
+
+        Notes
+        __________
+        prev is reused only if every attribute is the same object as in prev.
+        Only states whose results were calculated from current mA are shared
+        through cache. Stale states are kept for each matrix alone.
+        """
+        attr = vars(mat)
+        if prev is not None and len(attr) == len(prev) and \
+            all([k in prev and prev[k] is v for k, v in attr.items()]):
+            return prev
+        mat.mA.flags.writeable = False
+        key = (type(mat), mat.mA.tobytes())
+        if isinstance(mat, Fmpc):
+            fresh = not mat.stale
+        elif isinstance(mat, Impc):
+            fresh = not mat.stale
+        else:
+            fresh = mat.eigkey == key[1]
+        if not fresh:
+            return dict(attr)
+        state = self.cache.get(key)
+        if state is None:
+            state = dict(attr)
+            self.cache[key] = state
+        else:
+            mat.__dict__.update(state)
+        return state
+
+    def commit(self):
+        """
+        Take snapshot of all matrices as a new version of current scenario.
+        Versions after current one in the scenario are discarded.
+
+        Returns
+        __________
+
+        version : int
+            Number of the new version.
+        """
+        lisver = self.branches[self.branch]
+        pos = self.pos[self.branch]
+        prev = self.versions[lisver[pos]] if pos >= 0 else None
+        states = tuple(tuple(self.freeze(m, None if prev is None else prev[i][j])\
+            for j, m in enumerate(lis)) for i, lis in enumerate(self.trghie.lismA))
+        self.versions.append(states)
+        del lisver[pos + 1:]
+        lisver.append(len(self.versions) - 1)
+        self.pos[self.branch] = len(lisver) - 1
+        return len(self.versions) - 1
+
+    def restore(self, version):
+        """
+        Set all matrices to the version.
+
+        Parameters
+        __________
+
+        version : int
+            Number of version.
+        """
+        for lis, states in zip(self.trghie.lismA, self.versions[version]):
+            for m, state in zip(lis, states):
+                m.__dict__.update(state)
+
+    def undo(self):
+        """
+        Go back to previous version of current scenario.
+
+        Returns
+        __________
+
+        moved : bool
+            If there is no previous version, moved is False.
+        """
+        if self.pos[self.branch] <= 0:
+            return False
+        self.pos[self.branch] -= 1
+        self.restore(self.branches[self.branch][self.pos[self.branch]])
+        return True
+
+    def redo(self):
+        """
+        Go forward to next version of current scenario.
+
+        Returns
+        __________
+
+        moved : bool
+            If there is no next version, moved is False.
+        """
+        if self.pos[self.branch] >= len(self.branches[self.branch]) - 1:
+            return False
+        self.pos[self.branch] += 1
+        self.restore(self.branches[self.branch][self.pos[self.branch]])
+        return True
+
+    def fork(self, name):
+        """
+        Make new scenario from current version and switch to it.
+
+        Parameters
+        __________
+
+        name : str
+            Name of new scenario.
+        """
+        if name in self.branches:
+            raise ValueError('Scenario {} already exists'.format(name))
+        pos = self.pos[self.branch]
+        self.branches[name] = self.branches[self.branch][:pos + 1]
+        self.pos[name] = pos
+        self.branch = name
+
+    def checkout(self, name):
+        """
+        Switch to scenario and restore its current version.
+
+        Parameters
+        __________
+
+        name : str
+            Name of scenario.
+        """
+        self.branch = name
+        self.restore(self.branches[name][self.pos[name]])
+
+class Model:
+    """
+    Frozen criterion weights of Hierarchy for scoring alternative proposals.
+    Instances of this class are not changed after creation, so score can be
+    called from many threads at the same time.
+
+    Attributes
+    __________
+
+    weight : ndarray(m)
+        Global weights of leaf evaluetion standards (read-only).
+
+    fuctor : tuple of str
+        Name of leaf evaluetion standards.
+    """
+
+    def __init__(self, weight, fuctor):
+        """
+        Parameters
+        __________
+
+        weight : ndarray(m)
+            Global weights of leaf evaluetion standards.
+
+        fuctor : sequence of str
+            Name of leaf evaluetion standards.
+        """
+        self.weight = array(real(weight), dtype = float)
+        self.weight.flags.writeable = False
+        self.fuctor = tuple(fuctor)
+
+    def score(self, locpri):
+        """
+        Calculate global scores of alternative proposals.
+
+        Parameters
+        __________
+
+        locpri : ndarray(..., k, m)
+            Local priorities of k alternative proposals for each of
+            m leaf evaluetion standards. Leading axes are batches.
+
+        Returns
+        __________
+
+        importance : ndarray(..., k)
+            Importance of alternative proposals.
+        """
+        locpri = asarray(locpri)
+        if locpri.shape[-1] != self.weight.shape[0]:
+            raise ValueError('Last axis of locpri must have {} elements'\
+                .format(self.weight.shape[0]))
+        return locpri @ self.weight
+
 class Hierarchy:
     """
     Hierarchy data for Analytic Hierarchy Process.
@@ -114,9 +932,12 @@ class Hierarchy:
     numfuc : ndarray
         Number of evaluetion standards of alternative proposals in each hierarchy.
 
-    lismA : 2D list of Mpc
+    lismA : 2D list of Mpc, Fmpc or Impc
         List of matrix for pairwise comparsion.
 
+    history : History
+        Judgment history. Made by makemat.
+
     Notes
     __________
 
@@ -131,7 +952,7 @@ class Hierarchy:
         number : int
             Number of hierarchy layers.
         """
-        self.numhie  = number - 1
+        self.numhie  = number
         self.fuctor = [[] for i in arange(self.numhie)]
         self.numfuc = zeros(self.numhie, dtype = int)
         self.lismA = [[] for i in arange(self.numhie)]
@@ -152,16 +973,222 @@ class Hierarchy:
         self.fuctor[layer].append(name)
         self.numfuc[layer] = self.numfuc[layer] + 1
 
-    def makemat(self):
+    def makemat(self, fuzlayer = (), intlayer = ()):
         """
         Making Matrix for pairwise comparsion.
+
+        Parameters
+        __________
+
+        fuzlayer : sequence of int
+            Hierarchies which use Fmpc instead of Mpc.
+
+        intlayer : sequence of int
+            Hierarchies which use Impc instead of Mpc.
         """
-        self.lismA[0].append(Mpc(self.numfuc[0]))
+        mpc = [Fmpc if i in fuzlayer else Impc if i in intlayer else Mpc\
+            for i in range(self.numhie)]
+        self.lismA[0].append(mpc[0](self.numfuc[0]))
         for i in range(1, self.numhie):
-            for j in range(self.numfuc[i]):
-                self.lismA[i].append(Mpc(self.numfuc[j]))
+            for j in range(self.numfuc[i - 1]):
+                self.lismA[i].append(mpc[i](self.numfuc[i]))
+        self.history = History(self)
+
+    def calfuz(self, layer):
+        """
+        Calculate fuzzy weights of all stale Fmpc in the hierarchy at once.
+
+        Parameters
+        __________
+
+        layer : int
+            Number of hierarchy.
+        """
+        fmpc = [m for m in self.lismA[layer] if isinstance(m, Fmpc) and m.stale]
+        if len(fmpc) == 0:
+            return
+        t = time.perf_counter() if metrics.enabled else None
+        fmat = stack([m.mA for m in fmpc])
+        fweight = fuzgeomean(fmat)
+        evalmax = linalg.eigvals(fmat[..., 1]).real.max(axis = -1)
+        for m, w, e in zip(fmpc, fweight, evalmax):
+            m.setfuz(w, e)
+        if t is not None:
+            sec = (time.perf_counter() - t) / len(fmpc)
+            for m in fmpc:
+                metrics.solve(m, sec)
+
+    def fuzvec(self, layer):
+        """
+        Make the set of fuzzy weights of that hierarchy.
+
+        Parameters
+        __________
+
+        layer : int
+            Number of hierarchy.
+
+        Returns
+        __________
+
+        fmatvec : ndarray(k, n, 3)
+            Fuzzy weights of each matrix.
+            Weights of Mpc are treated as (x, x, x).
+        """
+        fmatvec = []
+        for m in self.lismA[layer]:
+            if isinstance(m, Fmpc):
+                fmatvec.append(m.fweight)
+            else:
+                vec = m.evecmax.real
+                fmatvec.append(repeat(vec[:, newaxis], 3, axis = 1))
+        return stack(fmatvec)
+
+    def runfuz(self, layer):
+        """
+        Run Fuzzy Analytic Hierarchy Process.
+
+        Parameters
+        __________
+
+        layer : int
+            Number of hierarchy which is calculated importance.
+
+        Returns
+        __________
+
+        importance : ndarray(n, 3)
+            Fuzzy importance as triangular fuzzy numbers.
+
+        Notes
+        __________
+        Product of triangular fuzzy numbers is approximated by
+        the product of each of lower, middle and upper values.
+        """
+        self.calfuz(layer)
+        if layer == 0:
+            return self.fuzvec(0)[0]
+        else:
+            return einsum('ik,ijk->jk', self.runfuz(layer - 1), self.fuzvec(layer))
+
+    def calint(self):
+        """
+        Calculate bounds of priorities of all stale Impc in all hierarchies
+        at once.
+        """
+        impc = []
+        names = []
+        for i, lis in enumerate(self.lismA):
+            for j, m in enumerate(lis):
+                if isinstance(m, Impc) and m.stale:
+                    impc.append(m)
+                    names.append('layer {} index {}'.format(i, j))
+        if len(impc) == 0:
+            return
+        t = time.perf_counter() if metrics.enabled else None
+        lisbound, nit = intbounds([m.mA for m in impc], names)
+        for m, b in zip(impc, lisbound):
+            m.setint(b)
+        if t is not None:
+            sec = (time.perf_counter() - t) / len(impc)
+            for m in impc:
+                metrics.solve(m, sec, iters = nit)
+
+    def intvec(self, layer):
+        """
+        Make the set of bounds of priorities of that hierarchy.
+
+        Parameters
+        __________
+
+        layer : int
+            Number of hierarchy.
+
+        Returns
+        __________
+
+        intmatvec : ndarray(k, n, 2)
+            (lower, upper) of priorities of each matrix.
+            Priorities of Mpc are treated as (x, x).
+        """
+        intmatvec = []
+        for m in self.lismA[layer]:
+            if isinstance(m, Impc):
+                intmatvec.append(m.bound)
+            else:
+                vec = m.evecmax.real
+                intmatvec.append(repeat(vec[:, newaxis], 2, axis = 1))
+        return stack(intmatvec)
+
+    def intstale(self, layer):
+        """
+        Check whether the hierarchy has stale Impc.
+
+        Parameters
+        __________
+
+        layer : int
+            Number of hierarchy.
+
+        Returns
+        __________
+
+        stale : bool
+            If any Impc of the hierarchy is stale, stale is True.
+        """
+        for m in self.lismA[layer]:
+            if isinstance(m, Impc) and m.stale:
+                return True
+        return False
+
+    def runint(self, layer):
+        """
+        Run Analytic Hierarchy Process with interval judgments.
+
+        Parameters
+        __________
+
+        layer : int
+            Number of hierarchy which is calculated importance.
+
+        Returns
+        __________
+
+        importance : ndarray(n, 2)
+            (lower, upper) of importance.
+
+        Notes
+        __________
+        Bounds are propagated by interval arithmetic, so they are
+        conservative. Stale Impc are calculated by calint first.
+        """
+        if self.intstale(layer):
+            self.calint()
+        if layer == 0:
+            return self.intvec(0)[0]
+        else:
+            return einsum('ik,ijk->jk', self.runint(layer - 1), self.intvec(layer))
+
+    def compile(self):
+        """
+        Freeze hierarchies above alternative proposals into Model.
+
+        Returns
+        __________
+
+        model : Model
+            Global weights of evaluetion standards of hierarchy numhie - 2.
+
+        Notes
+        __________
+        model.score(P) equals run(numhie - 1) when column k of P is
+        evecmax of lismA[numhie - 1][k].
+        """
+        if self.numhie < 2:
+            raise ValueError('Hierarchy needs evaluetion standards to compile')
+        return Model(self.run(self.numhie - 2), self.fuctor[self.numhie - 2])
 
-    def run(self):
+    def run(self, layer):
         """
         Run Analytic Hierarchy Process.
 
@@ -182,14 +1209,24 @@ class Hierarchy:
         Notes
         __________
         This is recursive call.
+        Stale Fmpc of each hierarchy are calculated by calfuz first,
+        and stale Impc by calint.
         """
+        self.calfuz(layer)
+        if self.intstale(layer):
+            self.calint()
         if layer == 0:
             return self.lismA[0][0].evecmax
         else:
+            upper = self.run(layer - 1)
+            t = time.perf_counter() if metrics.enabled else None
             matvec = self.lismA[layer][0].evecmax
-            for i in arange(1,self.numfuc[layer]):
+            for i in arange(1,self.numfuc[layer - 1]):
                 matvec = vstack((matvec,self.lismA[layer][i].evecmax))
-            return dot(self.run(layer - 1),matvec)
+            importance = dot(upper,matvec)
+            if t is not None:
+                metrics.synth(layer, time.perf_counter() - t)
+            return importance
 
 if __name__ == '__main__':
     print('Pleace execute "GUI_AHP"')
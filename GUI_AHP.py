@@ -4,208 +4,13 @@ from tkinter import ttk
 from matplotlib import *
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from AHP import *
 from random import *
+import logging
 #preace change font
 font = {"family":"yumin"}
 rc('font', **font)
 
-class Mpc:
-    """
-    Matrix for pairwise comparsion (for Analytic Hierarchy Process).
-
-    Attributes
-    __________
-
-    mA : ndarray(n,n)
-        Matrix for pairwise comparsion.
-        Square matrix with n elements.
-
-    n : int
-        Number of elements of matrix mA.
-
-    evallist : ndarray(n)
-        Eigenvalue of mA.
-        Array with n elements.
-
-    eveclist : ndarray(n,n)
-        Eigenvector of mA.
-        Have a total of n vectors with n elements.
-
-    evalmax :  float64
-        Maximum eigenvalue of mA.
-
-    evecmax : ndarray
-        Eigenvector for maximum eigenvalue.
-
-    ci : float64
-        CI(Consistency Index) of matrix mA.
-        The matrix mA is required to have a CI of 0.1 or less.
-    """
-
-    def __init__(self, numitem):
-        """
-        Parameters
-        __________
-
-        numitem : int
-            Number of items in the same hierarchy.
-        """
-        self.n = numitem
-        self.mA = identity(self.n)
-        self.caleig()
-        self.ci = (self.evalmax - self.n) / (self.n - 1)
-
-    def caleig(self):
-        """
-        Calculate maximum eigenvalue and eigenvector for maximum eigenvalue.
-        """
-        self.evallist,self.eveclist = linalg.eig(self.mA)
-        self.evalmax = 0
-        self.eveclist = self.eveclist.T
-        for i in arange(self.n):
-
-            self.eveclist[i] /= linalg.norm(self.eveclist[i])
-            self.eveclist[i] /= self.eveclist[i].sum()
-            if self.evalmax < self.evallist[i]:
-                self.evalmax = self.evallist[i]
-                self.evecmax = self.eveclist[i]
-
-    def setval(self,i,j,x):
-        """
-        Change the value of i-th row and j-th column of matrix mA to x.
-
-        Parameters
-        __________
-
-        i : int
-            Index of row of matrix mA.
-
-        j : int
-            Index of column of matrix mA.
-
-        x : float64
-            Value of i-th row and j-th column of matrix mA.
-        """
-        self.mA[i][j] = x
-        self.mA[j][i] = 1 / x
-        self.caleig()
-
-    def pristates(self):
-        print(self.mA)
-        print('ci = {}'.format(self.ci))
-
-    def cons(self):
-        """
-        Calculate Consistency Index of matrix mA.
-
-        Returns
-        __________
-
-        judge : bool
-            If matrix mA is consistent, judge is True.
-        """
-        self.ci = (self.evalmax - self.n) / (self.n - 1)
-        if self.ci < 0.1:
-            judge = True
-        else:
-            judge = False
-        return judge
-
-class Hierarchy:
-    """
-    Hierarchy data for Analytic Hierarchy Process.
-    Instances of this class have evaluetion standards, alternative proposals
-    and matrix of pairwise comparsion.
-
-    Attributes
-    __________
-
-    self.numhie : int
-        Number of hierarchy layers.
-
-    fuctor : 2D list of str
-        Name of evaluetion standards or alternative proposals.
-
-    numfuc : ndarray
-        Number of evaluetion standards of alternative proposals in each hierarchy.
-
-    lismA : 2D list of Mpc
-        List of matrix for pairwise comparsion.
-
-    Notes
-    __________
-
-    The smaller self.numhie is the higher hierarchy.
-    fuctor [self.numhie][] is alternative proposals.
-    """
-    def __init__(self, number = 2):
-        """
-        Parameters
-        __________
-
-        number : int
-            Number of hierarchy layers.
-        """
-        self.numhie  = number
-        self.fuctor = [[] for i in arange(self.numhie)]
-        self.numfuc = zeros(self.numhie, dtype = int)
-        self.lismA = [[] for i in arange(self.numhie)]
-
-    def addfuc(self, layer, name):
-        """
-        Add evaluetion standards of alternative proposals.
-
-        Parameters
-        __________
-
-        layer : int
-            Hierarchy of elements to be added.
-
-        name : str
-            Name of evaluetion standards of alternative proposals.
-        """
-        self.fuctor[layer].append(name)
-        self.numfuc[layer] = self.numfuc[layer] + 1
-
-    def makemat(self):
-        """
-        Making Matrix for pairwise comparsion.
-        """
-        self.lismA[0].append(Mpc(self.numfuc[0]))
-        for i in range(1, self.numhie):
-            for j in range(self.numfuc[i - 1]):
-                self.lismA[i].append(Mpc(self.numfuc[i]))
-
-    def run(self, layer):
-        """
-        Run Analytic Hierarchy Process.
-
-        Parameters
-        __________
-        layer : int
-            Number of hierarchy which is calculated importance.
-
-        matev : ndarray
-            The set of eigenvector for maximum eigenvalue of that hierarchy.
-
-        Returns
-        __________
-        importance : ndarray
-            Importance calculated based on Analytic Hierarchy Process.
-            If layer equal 0, return eigenvector for maximum eigenvalue of matrix mA.
-
-        Notes
-        __________
-        This is recursive call.
-        """
-        if layer == 0:
-            return self.lismA[0][0].evecmax
-        else:
-            matvec = self.lismA[layer][0].evecmax
-            for i in arange(1,self.numfuc[layer - 1]):
-                matvec = vstack((matvec,self.lismA[layer][i].evecmax))
-            return dot(self.run(layer - 1),matvec)
-
 class Appahp(tkinter.Frame):
     """
     Making popup window.
@@ -230,6 +35,13 @@ class Appahp(tkinter.Frame):
     evaval :  dictionary
         Correspondence table of button words and evaluetion values.
 
+    evafuz :  dictionary
+        Correspondence table of button words and triangular fuzzy numbers.
+        Used for hierarchies of Fmpc.
+
+    fuzlayer : sequence of int
+        Hierarchies which are evaluated by triangular fuzzy numbers.
+
     evabtn : list of ttk.Button
         Buttons to decide evaluetion value.
 
@@ -240,13 +52,17 @@ class Appahp(tkinter.Frame):
         Number of times the button was pressed.
 
     """
-    def __init__(self, trghie, master=None):
+    def __init__(self, trghie, master=None, fuzlayer=()):
         super().__init__(master)
         self.pack()
         self.trghie = trghie
+        self.fuzlayer = fuzlayer
         self.evatxt = ['同程度', '少し重要', '重要', 'かなり重要', '絶対に重要']
         self.evaval = {self.evatxt[0]:1, self.evatxt[1]:2, self.evatxt[2]:3,\
             self.evatxt[3]:4, self.evatxt[4]:5}
+        self.evafuz = {self.evatxt[0]:(1, 1, 1), self.evatxt[1]:(1, 2, 3),\
+            self.evatxt[2]:(2, 3, 4), self.evatxt[3]:(3, 4, 5),\
+            self.evatxt[4]:(4, 5, 5)}
         self.evabtn = []
         self.elelbl = []
         self.numclick = 0
@@ -346,11 +162,13 @@ class Appahp(tkinter.Frame):
         """
         Show elements of target list.
         """
-        print('Number of this hierarchy【{}】'.format(self.nowreg))
-        print('Number of element in this hierarchy【{}】'.format(self.trgnum[self.nowreg]))
-        j = 0
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        logger.debug('Number of this hierarchy【%s】', self.nowreg)
+        logger.debug('Number of element in this hierarchy【%s】',\
+            self.trgnum[self.nowreg])
         for i in arange(self.trgnum[self.nowreg]):
-            print(str(i) + ' : ' + self.trghie.fuctor[self.nowreg][i])
+            logger.debug('%s : %s', i, self.trghie.fuctor[self.nowreg][i])
 
     def changemode(self, event):
         """
@@ -366,7 +184,7 @@ class Appahp(tkinter.Frame):
             self.nowreg -= 1
             self.ccklbl["text"] = ''
         else:
-            self.trghie.makemat()
+            self.trghie.makemat(self.fuzlayer)
             self.create_widgets_fraval()
             self.fraval.tkraise()
 
@@ -504,9 +322,12 @@ class Appahp(tkinter.Frame):
     def judge(self, event):
         """
         Change the evaluetion value.
+        If target matrix is Fmpc, return triangular fuzzy number.
         """
         self.results.append(float(self.evaval[event.widget["text"]]))
         self.numclick += 1
+        if isinstance(self.trghie.lismA[self.nowreg][self.eletop], Fmpc):
+            return self.evafuz[event.widget["text"]]
         return float(self.evaval[event.widget["text"]])
 
     def setnextelelbl(self):
@@ -514,6 +335,7 @@ class Appahp(tkinter.Frame):
             self.ele1 -= 1
             if self.ele1 <= 0:
                 self.trghie.lismA[self.nowreg][self.eletop].pristates()
+                self.trghie.history.commit()
                 if self.trghie.lismA[self.nowreg][self.eletop].cons():
                     self.eletop -= 1
                     self.atelbl["text"] = ''
@@ -594,6 +416,8 @@ class Appahp(tkinter.Frame):
 
 
 if __name__ == '__main__':
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.DEBUG)
     mat_ahp = Hierarchy()
     root = tkinter.Tk()
     root.title('Analytic Hierarchy Process')
@@ -0,0 +1,362 @@
+import asyncio
+import itertools
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from numpy import *
+from AHP import Hierarchy, Fmpc, Impc
+
+class Session:
+    """
+    Judgment collection session of one respondent.
+
+    Attributes
+    __________
+
+    sid : int
+        Session number.
+
+    trghie : Hierarchy
+        Target AHP system of this session.
+
+    lock : asyncio.Lock
+        Lock so that requests of the same session are executed in order.
+    """
+
+    def __init__(self, sid, fuctor, fuzlayer = (), intlayer = ()):
+        """
+        Parameters
+        __________
+
+        sid : int
+            Session number.
+
+        fuctor : 2D list of str
+            Name of evaluetion standards or alternative proposals
+            for each hierarchy.
+
+        fuzlayer : sequence of int
+            Hierarchies which use Fmpc instead of Mpc.
+
+        intlayer : sequence of int
+            Hierarchies which use Impc instead of Mpc.
+        """
+        self.sid = sid
+        self.trghie = Hierarchy(len(fuctor))
+        for layer, names in enumerate(fuctor):
+            for name in names:
+                self.trghie.addfuc(layer, name)
+        self.trghie.makemat(fuzlayer, intlayer)
+        self.lock = asyncio.Lock()
+
+    def matrix(self, layer, index):
+        """
+        Return the matrix after checking layer and index.
+        """
+        for name, val in (('layer', layer), ('index', index)):
+            if type(val) is not int:
+                raise ValueError('{} must be int'.format(name))
+        if not 0 <= layer < self.trghie.numhie:
+            raise ValueError('layer {} is out of range'.format(layer))
+        if not 0 <= index < len(self.trghie.lismA[layer]):
+            raise ValueError('index {} is out of range'.format(index))
+        return self.trghie.lismA[layer][index]
+
+    def judgment(self, mat, i, j, x):
+        """
+        Check judgment before it is written to the matrix.
+
+        Parameters
+        __________
+
+        mat : Mpc, Fmpc or Impc
+            Target matrix.
+
+        i : int
+            Index of row of matrix mA.
+
+        j : int
+            Index of column of matrix mA.
+
+        x : float, or list of float for Fmpc (lower, middle, upper)
+            and Impc (lower, upper)
+            Judgment.
+
+        Returns
+        __________
+
+        x : float64 or ndarray
+            Checked judgment.
+        """
+        for name, val in (('i', i), ('j', j)):
+            if type(val) is not int or not 0 <= val < mat.n:
+                raise ValueError('{} must be int in [0, {})'.format(name, mat.n))
+        if i == j:
+            raise ValueError('i and j must be different')
+        size = 3 if isinstance(mat, Fmpc) else 2 if isinstance(mat, Impc) else 1
+        vals = x if isinstance(x, list) and size > 1 else [x]
+        if len(vals) not in (1, size) or \
+            any([type(v) not in (int, float) for v in vals]):
+            if size == 1:
+                raise ValueError('x must be a number')
+            raise ValueError('x must be a number or a list of {} numbers'\
+                .format(size))
+        vals = array(vals, dtype = float)
+        if not isfinite(vals).all() or (vals <= 0).any():
+            raise ValueError('x must be finite and positive')
+        if (diff(vals) < 0).any():
+            raise ValueError('x must be in ascending order')
+        return vals[0] if len(vals) == 1 else vals
+
+    def ci(self, mat):
+        """
+        Return CI of the matrix for JSON.
+        None is returned when CI is not finite (e.g. infeasible Impc).
+        """
+        ci = float(real(mat.ci))
+        return ci if isfinite(ci) else None
+
+    def setval(self, layer, index, i, j, x):
+        """
+        Set judgment and return consistency of the matrix.
+        Invalid requests raise ValueError before the matrix is changed.
+        """
+        mat = self.matrix(layer, index)
+        mat.setval(i, j, self.judgment(mat, i, j, x))
+        judge = mat.cons()
+        return {'ci': self.ci(mat), 'judge': judge}
+
+    def check(self, layer, index):
+        """
+        Return consistency of the matrix.
+        """
+        mat = self.matrix(layer, index)
+        judge = mat.cons()
+        return {'ci': self.ci(mat), 'judge': judge}
+
+    def run(self):
+        """
+        Return importance of alternative proposals.
+        """
+        importance = self.trghie.run(self.trghie.numhie - 1)
+        return {'importance': real(importance).tolist()}
+
+class Server:
+    """
+    Asyncio server hosting many judgment collection sessions in one process.
+    Calculation of each session is executed in executor so that it does
+    not block the event loop.
+
+    Attributes
+    __________
+
+    sessions : dictionary
+        Sessions keyed by session number.
+
+    executor : concurrent.futures.Executor
+        Executor for consistency checks and synthesis.
+    """
+
+    def __init__(self, executor = None):
+        """
+        Parameters
+        __________
+
+        executor : concurrent.futures.Executor
+            Executor for calculation.
+            If executor is None, ThreadPoolExecutor is used.
+        """
+        self.sessions = {}
+        self.executor = executor if executor is not None else ThreadPoolExecutor()
+        self.sidgen = itertools.count()
+
+    async def handle(self, req):
+        """
+        Execute one request.
+
+        Parameters
+        __________
+
+        req : dictionary
+            Request with key "op" of "open", "set", "check", "run" or "close".
+
+        Returns
+        __________
+
+        res : dictionary
+            Response. If the request failed, res has key "error".
+        """
+        try:
+            if not isinstance(req, dict):
+                return {'error': 'request must be a JSON object'}
+            op = req['op']
+            loop = asyncio.get_running_loop()
+            if op == 'open':
+                sid = next(self.sidgen)
+                self.sessions[sid] = await loop.run_in_executor(self.executor,\
+                    lambda: Session(sid, req['fuctor'],\
+                    req.get('fuzlayer', ()), req.get('intlayer', ())))
+                return {'sid': sid}
+            ses = self.sessions[req['sid']]
+            if op == 'close':
+                del self.sessions[ses.sid]
+                return {}
+            if op == 'set':
+                func = lambda: ses.setval(req['layer'], req['index'],\
+                    req['i'], req['j'], req['x'])
+            elif op == 'check':
+                func = lambda: ses.check(req['layer'], req['index'])
+            elif op == 'run':
+                func = ses.run
+            else:
+                return {'error': 'unknown op: {}'.format(op)}
+            async with ses.lock:
+                return await loop.run_in_executor(self.executor, func)
+        except Exception as err:
+            return {'error': '{}: {}'.format(type(err).__name__, err)}
+
+    async def client(self, reader, writer):
+        """
+        Serve one TCP connection. Each line is a JSON request.
+        """
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                res = await self.handle(json.loads(line))
+            except Exception as err:
+                res = {'error': '{}: {}'.format(type(err).__name__, err)}
+            writer.write((json.dumps(res) + '\n').encode())
+            await writer.drain()
+        writer.close()
+
+    async def serve(self, host = '127.0.0.1', port = 8765):
+        """
+        Run TCP server with JSON lines protocol.
+        """
+        server = await asyncio.start_server(self.client, host, port)
+        async with server:
+            await server.serve_forever()
+
+class LocalClient:
+    """
+    In-process stand-in for a TCP client.
+    Requests are passed to Server.handle directly.
+    """
+
+    def __init__(self, server):
+        self.server = server
+
+    async def request(self, **req):
+        res = await self.server.handle(req)
+        if 'error' in res:
+            raise RuntimeError(res['error'])
+        return res
+
+async def respondent(client, numalt, numcrit, latency):
+    """
+    Simulate one respondent who answers all pairwise comparsions.
+
+    Parameters
+    __________
+
+    client : LocalClient
+        Client connected to server.
+
+    numalt : int
+        Number of alternative proposals.
+
+    numcrit : int
+        Number of evaluetion standards.
+
+    latency : list of float
+        Latency of each request in seconds is appended to this list.
+    """
+    async def call(**req):
+        t = time.perf_counter()
+        res = await client.request(**req)
+        latency.append(time.perf_counter() - t)
+        return res
+
+    fuctor = [['c{}'.format(i) for i in range(numcrit)],\
+        ['a{}'.format(i) for i in range(numalt)]]
+    sid = (await call(op = 'open', fuctor = fuctor))['sid']
+    for layer, index, n in [(0, 0, numcrit)] + \
+        [(1, k, numalt) for k in range(numcrit)]:
+        w = random.random(n) + 0.2
+        for i in range(n):
+            for j in range(i + 1, n):
+                val = clip(rint(w[i] / w[j]), 1, 5)
+                if w[i] >= w[j]:
+                    await call(op = 'set', sid = sid, layer = layer,\
+                        index = index, i = i, j = j, x = float(val))
+                else:
+                    val = clip(rint(w[j] / w[i]), 1, 5)
+                    await call(op = 'set', sid = sid, layer = layer,\
+                        index = index, i = j, j = i, x = float(val))
+        await call(op = 'check', sid = sid, layer = layer, index = index)
+    await call(op = 'run', sid = sid)
+    await call(op = 'close', sid = sid)
+
+async def loadtest(numresp = 1000, concurrency = 200, numalt = 4, numcrit = 4,\
+    server = None):
+    """
+    Simulate many respondents against an in-process server.
+
+    Parameters
+    __________
+
+    numresp : int
+        Number of respondents.
+
+    concurrency : int
+        Number of respondents answering at the same time.
+
+    numalt : int
+        Number of alternative proposals.
+
+    numcrit : int
+        Number of evaluetion standards.
+
+    server : Server
+        Target server. If server is None, a new Server is used.
+
+    Returns
+    __________
+
+    report : dictionary
+        Sessions per second, sessions per CPU second and
+        latency percentiles in milliseconds.
+        CPU seconds are process CPU time (time.process_time) of all threads,
+        so sessions per CPU second does not depend on the number of cores.
+    """
+    server = server if server is not None else Server()
+    client = LocalClient(server)
+    sem = asyncio.Semaphore(concurrency)
+    latency = []
+
+    async def one():
+        async with sem:
+            await respondent(client, numalt, numcrit, latency)
+
+    t = time.perf_counter()
+    cpu = time.process_time()
+    await asyncio.gather(*[one() for k in range(numresp)])
+    sec = time.perf_counter() - t
+    cpu = time.process_time() - cpu
+    lat = array(latency) * 1000
+    return {'sessions': numresp, 'seconds': sec, 'cpu_seconds': cpu,\
+        'sessions_per_sec': numresp / sec,\
+        'sessions_per_cpu_sec': numresp / cpu,\
+        'p50_ms': percentile(lat, 50), 'p99_ms': percentile(lat, 99),\
+        'p999_ms': percentile(lat, 99.9), 'max_ms': lat.max()}
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'load':
+        numresp = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+        print(json.dumps(asyncio.run(loadtest(numresp)), indent = 1))
+    else:
+        port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+        asyncio.run(Server().serve(port = port))